@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import copy
+import functools
+import itertools
 import json
 import os
+import re
 import subprocess
+import tempfile
+import threading
 import yaml
-from pathlib import Path, PurePosixPath
-from typing import Iterable, List, Optional
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, List, Optional
 
 from mcp.server.fastmcp import FastMCP
 from mcp.types import (
@@ -15,73 +23,241 @@ from mcp.types import (
     TextContent,
 )
 
+# Prefer the libyaml C bindings; fall back to pure Python when unavailable
+try:
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - depends on PyYAML build
+    from yaml import SafeDumper as _SafeDumper
+    from yaml import SafeLoader as _SafeLoader
+
+# Optional faster JSON decoding / streaming for kubectl output
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional dependency
+    _json_loads = json.loads
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
 APP_NAME = "draupnir-mcp-server"
-DEFAULT_DATA_DIR = Path(os.environ.get("STATIC_MCP_DATA_DIR", "./data")).resolve()
+_data_dir: Path | None = None
+_SCAN_WORKERS = min(8, os.cpu_count() or 1)
 
 mcp = FastMCP(APP_NAME)
 
+def get_data_dir() -> Path:
+    """Active data dir: set_data_dir() override, else STATIC_MCP_DATA_DIR (default ./data)."""
+    global _data_dir
+    if _data_dir is None:
+        _data_dir = Path(os.environ.get("STATIC_MCP_DATA_DIR", "./data")).resolve()
+    return _data_dir
+
+def set_data_dir(path: str | os.PathLike[str]) -> Path:
+    """Point all tools at a new data dir without reloading the module."""
+    global _data_dir
+    _data_dir = Path(path).expanduser().resolve()
+    return _data_dir
+
 # Utilities
-def _iter_files(root: Path) -> Iterable[Path]:
-    if not root.exists():
-        return []
-    for p in root.rglob("*"):
-        if p.is_file():
-            yield p
+@functools.lru_cache(maxsize=4096)
+def _list_dir_cached(path_str: str, mtime_ns: int) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Return (file names, subdir names) of one directory; a new mtime means a fresh scan."""
+    files: list[str] = []
+    dirs: list[str] = []
+    # os.scandir reuses DirEntry metadata, avoiding a stat() per entry
+    with os.scandir(path_str) as it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                dirs.append(e.name)
+            elif e.is_file(follow_symlinks=False):
+                files.append(e.name)
+    return tuple(files), tuple(dirs)
+
+def _walk(dir_str: str, rel_prefix: str) -> Iterator[tuple[str, str]]:
+    # Relative paths are built by string concatenation, not Path arithmetic
+    try:
+        files, dirs = _list_dir_cached(dir_str, os.stat(dir_str).st_mtime_ns)
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        return
+    for name in files:
+        yield os.path.join(dir_str, name), rel_prefix + name
+    for name in dirs:
+        yield from _walk(os.path.join(dir_str, name), rel_prefix + name + "/")
+
+def _iter_files(root: Path) -> Iterator[Path]:
+    for path, _ in _walk(os.fspath(root), ""):
+        yield Path(path)
+
+def _iter_files_with_rel(root: Path) -> Iterator[tuple[Path, str]]:
+    """Yield (path, posix path relative to the data dir) for files under root."""
+    rel_root = root.relative_to(get_data_dir()).as_posix()
+    for path, rel in _walk(os.fspath(root), "" if rel_root == "." else rel_root + "/"):
+        yield Path(path), rel
+
+def _read_text_fast(p: str | Path) -> str:
+    # Unbuffered whole-file read skips the BufferedReader/TextIOWrapper setup
+    with open(p, "rb", buffering=0) as f:
+        text = f.read().decode("utf-8")
+    if "\r" in text:
+        # Match text-mode universal newlines
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+@functools.lru_cache(maxsize=4096)
+def _load_yaml_cached(path_str: str, mtime_ns: int, size: int) -> Any:
+    return yaml.load(_read_text_fast(path_str), Loader=_SafeLoader)
+
+def _load_yaml(p: Path) -> Any:
+    # The cached document is shared; hand out a copy so callers cannot corrupt it
+    st = os.stat(p)
+    return copy.deepcopy(_load_yaml_cached(os.fspath(p), st.st_mtime_ns, st.st_size))
 
 def _enforce_under(path: Path, base: Path) -> None:
-    try:
-        path.relative_to(base)
-    except Exception:
+    # Callers pass resolve()d paths, so a string prefix test is enough
+    bs, ps = os.fspath(base), os.fspath(path)
+    if not (ps == bs or ps.startswith(bs.rstrip(os.sep) + os.sep)):
         raise PermissionError(f"Access outside data dir is not allowed: {path}")
 
+_MIME_MAP = {
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".json": "application/json",
+    ".csv": "text/csv",
+    ".yaml": "application/yaml",
+    ".yml": "application/yaml",
+}
+
 def _guess_mime(ext: str) -> Optional[str]:
-    ext = ext.lower()
-    return {
-        ".txt": "text/plain",
-        ".md": "text/markdown",
-        ".json": "application/json",
-        ".csv": "text/csv",
-        ".yaml": "application/yaml",
-        ".yml": "application/yaml",
-    }.get(ext)
-
-def _expand_brace_patterns(pattern: str) -> List[str]:
-    if "{" not in pattern or "}" not in pattern:
-        return [pattern]
-    pre, _, rest = pattern.partition("{")
-    inner, sep, post = rest.partition("}")
-    if not sep:
-        return [pattern]
-    return [pre + opt + post for opt in inner.split(",")]
-
-def _normalize_patterns(pattern: str) -> List[str]:
-    pats = _expand_brace_patterns(pattern)
-    out: List[str] = []
-    for pat in pats:
-        out.append(pat)
-        if pat.startswith("**/"):
-            out.append(pat[3:])
-    return out
+    return _MIME_MAP.get(ext.lower())
+
+_MAX_BRACE_EXPANSIONS = 256
+
+@functools.lru_cache(maxsize=256)
+def _expand_brace_patterns(pattern: str) -> tuple[str, ...]:
+    """Expand shell-style {a,b} groups, including nested and repeated ones."""
+    # Patterns come from tool arguments; bound the product of repeated groups
+    depth, start, commas = 0, -1, []
+    for i, c in enumerate(pattern):
+        if c == "{":
+            if depth == 0:
+                start, commas = i, []
+            depth += 1
+        elif c == "," and depth == 1:
+            commas.append(i)
+        elif c == "}" and depth:
+            depth -= 1
+            # A group without a top-level comma (e.g. "{x}") stays literal
+            if depth == 0 and commas:
+                pre, post = pattern[:start], pattern[i + 1 :]
+                bounds = [start, *commas, i]
+                out: list[str] = []
+                for a, b in itertools.pairwise(bounds):
+                    out.extend(_expand_brace_patterns(pre + pattern[a + 1 : b] + post))
+                    if len(out) > _MAX_BRACE_EXPANSIONS:
+                        raise ValueError(f"Glob expands to more than {_MAX_BRACE_EXPANSIONS} patterns")
+                return tuple(dict.fromkeys(out))
+    return (pattern,)
+
+def _translate_segment(seg: str) -> str:
+    # fnmatch.translate lets "*" cross "/", so translate one path segment by hand
+    res: list[str] = []
+    i, n = 0, len(seg)
+    while i < n:
+        c = seg[i]
+        i += 1
+        if c == "*":
+            res.append("[^/]*")
+        elif c == "?":
+            res.append("[^/]")
+        elif c == "[":
+            j = i
+            if j < n and seg[j] in "!^":
+                j += 1
+            if j < n and seg[j] == "]":
+                j += 1
+            j = seg.find("]", j)
+            if j == -1:
+                res.append("\\[")
+            else:
+                body = seg[i:j].replace("\\", "\\\\")
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                res.append(f"[{body}]")
+                i = j + 1
+        else:
+            res.append(re.escape(c))
+    return "".join(res)
+
+def _glob_to_regex(pattern: str) -> str:
+    # Like PurePosixPath.match, relative patterns match from the right;
+    # only a leading "/" anchors the pattern at the data dir
+    if pattern.startswith("/"):
+        pattern = pattern.lstrip("/")
+    else:
+        while pattern.startswith("./"):
+            pattern = pattern[2:]
+        pattern = "**/" + pattern
+    parts = pattern.split("/")
+    out: list[str] = []
+    for idx, seg in enumerate(parts):
+        last = idx == len(parts) - 1
+        if seg == "**":
+            out.append(".*" if last else "(?:[^/]*/)*")
+        else:
+            seg_rx = _translate_segment(seg)
+            out.append(seg_rx if last else seg_rx + "/")
+    return "".join(out)
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> re.Pattern[str]:
+    alts = [_glob_to_regex(pat) for pat in _expand_brace_patterns(pattern)]
+    return re.compile("(?s:" + "|".join(alts) + ")\\Z")
 
 def _matches(path: str, pattern: str) -> bool:
-    for pat in _normalize_patterns(pattern):
-        if PurePosixPath(path).match(pat):
-            return True
-    return False
+    return _compile_pattern(pattern).match(path) is not None
+
+def _glob_prefix(pattern: str) -> str:
+    """Literal leading directories of a rooted ("/"-prefixed) glob; "" for relative globs."""
+    # Relative globs match from the right, so they can hit any subtree
+    if not pattern.startswith("/"):
+        return ""
+    prefix: list[str] = []
+    for seg in pattern.lstrip("/").split("/")[:-1]:
+        if seg in ("", ".", "..") or any(c in seg for c in "*?[{"):
+            break
+        prefix.append(seg)
+    return "/".join(prefix)
+
+def _glob_base(pattern: str | None) -> Path:
+    # Start the walk at the glob's literal prefix; rooted patterns cannot match above it
+    data_dir = get_data_dir()
+    prefix = _glob_prefix(pattern) if pattern else ""
+    if not prefix:
+        return data_dir
+    base = data_dir / prefix
+    # The full walk never follows symlinks, so neither may the shortcut
+    if os.path.realpath(base) != os.fspath(base):
+        return data_dir
+    return base
 
 # Resources (conditionally register for FastMCP variants)
 if hasattr(mcp, "resource"):
     @mcp.resource("file://")
     def list_resources() -> List[Resource]:
         resources: List[Resource] = []
-        for file_path in _iter_files(DEFAULT_DATA_DIR):
-            rel = file_path.relative_to(DEFAULT_DATA_DIR)
+        data_dir = get_data_dir()
+        for file_path in _iter_files(data_dir):
+            rel = file_path.relative_to(data_dir)
             uri = f"file://{file_path}"
             resources.append(
                 Resource(
                     uri=uri,
                     name=str(rel),
-                    description=f"Static file '{rel}' from {DEFAULT_DATA_DIR}",
+                    description=f"Static file '{rel}' from {data_dir}",
                     mimeType=_guess_mime(file_path.suffix),
                 )
             )
@@ -89,14 +265,15 @@ if hasattr(mcp, "resource"):
 else:
     def list_resources() -> List[Resource]:
         resources: List[Resource] = []
-        for file_path in _iter_files(DEFAULT_DATA_DIR):
-            rel = file_path.relative_to(DEFAULT_DATA_DIR)
+        data_dir = get_data_dir()
+        for file_path in _iter_files(data_dir):
+            rel = file_path.relative_to(data_dir)
             uri = f"file://{file_path}"
             resources.append(
                 Resource(
                     uri=uri,
                     name=str(rel),
-                    description=f"Static file '{rel}' from {DEFAULT_DATA_DIR}",
+                    description=f"Static file '{rel}' from {data_dir}",
                     mimeType=_guess_mime(file_path.suffix),
                 )
             )
@@ -108,78 +285,127 @@ if hasattr(mcp, "resource_contents"):
         if not uri.startswith("file://"):
             raise ValueError("Only file:// URIs are supported")
         file_path = Path(uri[len("file://") :])
-        data = file_path.read_text(encoding="utf-8")
+        data = _read_text_fast(file_path)
         return [TextContent(type="text", text=data)]
 else:
     def read_resource(uri: str) -> ResourceContents:
         if not uri.startswith("file://"):
             raise ValueError("Only file:// URIs are supported")
         file_path = Path(uri[len("file://") :])
-        data = file_path.read_text(encoding="utf-8")
+        data = _read_text_fast(file_path)
         return [TextContent(type="text", text=data)]
 
 # Generic Tools
 @mcp.tool()
 def list_files(pattern: Optional[str] = None) -> List[str]:
-    files = [p.relative_to(DEFAULT_DATA_DIR).as_posix() for p in _iter_files(DEFAULT_DATA_DIR)]
+    files = [rel for _, rel in _iter_files_with_rel(_glob_base(pattern))]
     if pattern:
-        files = [f for f in files if _matches(f, pattern)]
+        rx = _compile_pattern(pattern)
+        files = [f for f in files if rx.match(f) is not None]
     return files
 
 @mcp.tool()
 def read_text(path: str) -> str:
-    fp = (DEFAULT_DATA_DIR / path).resolve()
-    _enforce_under(fp, DEFAULT_DATA_DIR)
-    return fp.read_text(encoding="utf-8")
+    data_dir = get_data_dir()
+    fp = (data_dir / path).resolve()
+    _enforce_under(fp, data_dir)
+    return _read_text_fast(fp)
 
 @mcp.tool()
 def search_text(query: str, path_glob: str = "**/*") -> List[dict]:
     results: List[dict] = []
     q = query.lower()
-    for p in _iter_files(DEFAULT_DATA_DIR):
-        rel = p.relative_to(DEFAULT_DATA_DIR).as_posix()
-        if path_glob and not _matches(rel, path_glob):
+    rx = _compile_pattern(path_glob) if path_glob else None
+    for p, rel in _iter_files_with_rel(_glob_base(path_glob)):
+        if rx is not None and rx.match(rel) is None:
             continue
         try:
-            lines = p.read_text(encoding="utf-8").splitlines()
-        except Exception:
+            text = _read_text_fast(p)
+        except (UnicodeDecodeError, OSError):
+            continue
+        # Reject files without a hit in one pass before splitting into lines
+        if q not in text.lower():
             continue
-        for i, line in enumerate(lines, start=1):
+        for i, line in enumerate(text.splitlines(), start=1):
             if q in line.lower():
                 results.append({"path": rel, "line_no": i, "line": line})
     return results
 
 @mcp.tool()
 def healthcheck() -> str:
-    return f"OK: data_dir={DEFAULT_DATA_DIR}"
+    return f"OK: data_dir={get_data_dir()}"
 
 # Cilium / Draupnir‑aligned Tools
 CILIUM_KINDS = {"CiliumNetworkPolicy", "CiliumClusterwideNetworkPolicy"}
+_YAML_SUFFIXES = (".yaml", ".yml")
+
+# The line must end cleanly so truncated or odd values fall back to a full parse
+_KIND_RE = re.compile(rb"^kind:[ \t]*[\"']?([A-Za-z0-9]+)[\"']?[ \t]*(?:#.*)?\r?$", re.MULTILINE)
+_SNIFF_BYTES = 4096
+
+@functools.lru_cache(maxsize=4096)
+def _sniff_kind(path_str: str, mtime_ns: int, size: int) -> str | None:
+    """Top-level `kind:` from the file header, or None when it cannot be read cheaply."""
+    with open(path_str, "rb", buffering=0) as f:
+        buf = f.read(_SNIFF_BYTES)
+    if len(buf) == _SNIFF_BYTES:
+        buf = buf[: buf.rfind(b"\n") + 1]
+    kinds = _KIND_RE.findall(buf)
+    return kinds[0].decode("ascii") if len(kinds) == 1 else None
+
+def _load_cilium_doc(p: Path) -> dict | None:
+    """Parsed policy if p is a single-document CNP/CCNP, else None."""
+    try:
+        st = os.stat(p)
+        path_str = os.fspath(p)
+        kind = _sniff_kind(path_str, st.st_mtime_ns, st.st_size)
+        if kind is not None and kind not in CILIUM_KINDS:
+            return None
+        doc = _load_yaml_cached(path_str, st.st_mtime_ns, st.st_size)
+    except Exception:
+        return None
+    if isinstance(doc, dict) and doc.get("kind") in CILIUM_KINDS:
+        return doc
+    return None
+
+def _dict_entries(value: Any) -> list[dict]:
+    # Malformed policies may hold strings or scalars where rule mappings belong
+    if not isinstance(value, list):
+        return []
+    return [v for v in value if isinstance(v, dict)]
+
+def _egress_has_dns(egress_rules: Any) -> bool:
+    """True if any egress rule pins FQDNs or opens port 53."""
+    for rule in _dict_entries(egress_rules):
+        if rule.get("toFQDNs"):
+            return True
+        for tp in _dict_entries(rule.get("toPorts")):
+            for pt in _dict_entries(tp.get("ports")):
+                if str(pt.get("port", "")) == "53" and pt.get("protocol") in (None, "UDP", "TCP", "ANY"):
+                    return True
+    return False
 
 @mcp.tool()
 def list_cilium_policies(path_glob: str = "**/*.{yml,yaml}") -> List[str]:
     """List YAML files that look like Cilium (CNP/CCNP)."""
     hits: List[str] = []
-    for p in _iter_files(DEFAULT_DATA_DIR):
-        rel = p.relative_to(DEFAULT_DATA_DIR).as_posix()
-        if path_glob and not _matches(rel, path_glob):
-            continue
-        if p.suffix.lower() not in {".yaml", ".yml"}:
+    rx = _compile_pattern(path_glob) if path_glob else None
+    for p, rel in _iter_files_with_rel(_glob_base(path_glob)):
+        if not rel.lower().endswith(_YAML_SUFFIXES):
             continue
-        try:
-            doc = yaml.safe_load(p.read_text(encoding="utf-8"))
-        except Exception:
+        if rx is not None and rx.match(rel) is None:
             continue
-        if isinstance(doc, dict) and doc.get("kind") in CILIUM_KINDS:
+        if _load_cilium_doc(p) is not None:
             hits.append(rel)
     return hits
 
 @mcp.tool()
 def validate_cilium_policy(path: str) -> dict:
     """Basic validation & hardening hints for a single Cilium policy file."""
-    fp = (DEFAULT_DATA_DIR / path).resolve()
-    _enforce_under(fp, DEFAULT_DATA_DIR)
-    data = yaml.safe_load(fp.read_text(encoding="utf-8"))
+    data_dir = get_data_dir()
+    fp = (data_dir / path).resolve()
+    _enforce_under(fp, data_dir)
+    data = _load_yaml(fp)
 
     result = {"path": path, "errors": [], "warnings": [], "kind": None, "metadata": {}, "summary": {}}
 
@@ -225,27 +451,100 @@ def validate_cilium_policy(path: str) -> dict:
         result["warnings"].append("Egress has no L4/L7 ports (coarse allow?)")
 
     # DNS egress recommendation
-    if have_egress:
-        text = yaml.safe_dump(spec.get("egress"))
-        if "53" not in text and "toFQDNs" not in text:
-            result["warnings"].append("No explicit DNS egress (add kube-dns:53 or toFQDNs)")
+    if have_egress and not _egress_has_dns(spec.get("egress")):
+        result["warnings"].append("No explicit DNS egress (add kube-dns:53 or toFQDNs)")
 
     return result
 
+# Invariant part of every generated policy; only ever serialized, never mutated
+_KUBE_DNS_EGRESS = {
+    "toEndpoints": [{"matchLabels": {"k8s:io.kubernetes.pod.namespace": "kube-system", "k8s-app": "kube-dns"}}],
+    "toPorts": [{"ports": [{"port": "53", "protocol": "UDP"}]}],
+}
+
+# Same document as the dict path, pre-rendered in the layout the SafeDumper emits
+_POLICY_YAML_TMPL = """\
+apiVersion: cilium.io/v2
+kind: CiliumNetworkPolicy
+metadata:
+  name: {name}
+  namespace: {namespace}
+spec:
+  endpointSelector:
+    matchLabels:
+      k8s:io.kubernetes.pod.namespace: {namespace}
+      app: {app}
+  ingress:
+  - fromEndpoints:
+    - matchLabels:
+        app: {app}
+    toPorts:
+{to_ports}  egress:
+  - toFQDNs:
+{fqdns}  - toEndpoints:
+    - matchLabels:
+        k8s:io.kubernetes.pod.namespace: kube-system
+        k8s-app: kube-dns
+    toPorts:
+    - ports:
+      - port: '53'
+        protocol: UDP
+"""
+_YAML_PLAIN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_.\-]*")
+_YAML_INT_RE = re.compile(r"0|[1-9][0-9]*")
+_YAML_ALIAS_LIKE_RE = re.compile(r"\*[A-Za-z0-9_.\-]*")
+_YAML_RESERVED = {
+    v for w in ("yes", "no", "true", "false", "on", "off", "null") for v in (w, w.capitalize(), w.upper())
+}
+
+def _yq(value: str) -> str | None:
+    """Render a scalar exactly as SafeDumper would, or None if unsure."""
+    if not isinstance(value, str):
+        return None
+    if _YAML_PLAIN_RE.fullmatch(value):
+        return f"'{value}'" if value in _YAML_RESERVED else value
+    # Digit strings resolve to int and leading "*" reads as an alias; the dumper single-quotes both
+    if _YAML_INT_RE.fullmatch(value) or _YAML_ALIAS_LIKE_RE.fullmatch(value):
+        return f"'{value}'"
+    return None
+
+def _render_policy_fast(app: str, namespace: str, ports: list[tuple[str, str]], fqdns: list[str]) -> str | None:
+    app_q, ns_q, name_q = _yq(app), _yq(namespace), _yq(f"{app}-ztp")
+    if app_q is None or ns_q is None or name_q is None:
+        return None
+    port_lines: list[str] = []
+    for port, proto in ports:
+        port_q, proto_q = _yq(port), _yq(proto)
+        if port_q is None or proto_q is None:
+            return None
+        port_lines.append(f"    - ports:\n      - port: {port_q}\n        protocol: {proto_q}\n")
+    fqdn_lines: list[str] = []
+    for fqdn in fqdns:
+        fqdn_q = _yq(fqdn)
+        if fqdn_q is None:
+            return None
+        fqdn_lines.append(f"    - matchName: {fqdn_q}\n")
+    return _POLICY_YAML_TMPL.format(
+        name=name_q, namespace=ns_q, app=app_q, to_ports="".join(port_lines), fqdns="".join(fqdn_lines)
+    )
+
 @mcp.tool()
 def generate_policy_template(
     app: str,
     namespace: str,
     ingress_ports: Optional[List[str]] = None,
     egress_fqdns: Optional[List[str]] = None,
+    strict: bool = False,
 ) -> str:
-    """Generate a CiliumNetworkPolicy skeleton for an app."""
+    """Generate a CiliumNetworkPolicy skeleton for an app (strict=True always uses the YAML dumper)."""
     ingress_ports = ingress_ports or ["80/TCP", "443/TCP"]
     egress_fqdns = egress_fqdns or ["*.amazonaws.com"]
+    ports = [(port, proto or "TCP") for port, _, proto in (p.partition("/") for p in ingress_ports)]
 
-    def port_obj(p: str):
-        port, proto = p.split("/") if "/" in p else (p, "TCP")
-        return {"ports": [{"port": str(port), "protocol": proto}]}
+    if not strict:
+        fast = _render_policy_fast(app, namespace, ports, egress_fqdns)
+        if fast is not None:
+            return fast
 
     doc = {
         "apiVersion": "cilium.io/v2",
@@ -254,16 +553,18 @@ def generate_policy_template(
         "spec": {
             "endpointSelector": {"matchLabels": {"k8s:io.kubernetes.pod.namespace": namespace, "app": app}},
             "ingress": [
-                {"fromEndpoints": [{"matchLabels": {"app": app}}], "toPorts": [port_obj(p) for p in ingress_ports]},
+                {
+                    "fromEndpoints": [{"matchLabels": {"app": app}}],
+                    "toPorts": [{"ports": [{"port": port, "protocol": proto}]} for port, proto in ports],
+                },
             ],
             "egress": [
                 {"toFQDNs": [{"matchName": fqdn} for fqdn in egress_fqdns]},
-                {"toEndpoints": [{"matchLabels": {"k8s:io.kubernetes.pod.namespace": "kube-system", "k8s-app": "kube-dns"}}],
-                 "toPorts": [{"ports": [{"port": "53", "protocol": "UDP"}]}]},
+                _KUBE_DNS_EGRESS,
             ],
         },
     }
-    return yaml.safe_dump(doc, sort_keys=False)
+    return yaml.dump(doc, Dumper=_SafeDumper, sort_keys=False)
 
 @mcp.tool()
 def hubble_filters(src: str = "", dst: str = "", verdict: str = "") -> dict:
@@ -280,42 +581,48 @@ def hubble_filters(src: str = "", dst: str = "", verdict: str = "") -> dict:
         "filters": {"from": src or None, "to": dst or None, "verdict": verdict or None},
     }
 
+@functools.cache
+def _scan_pool() -> ThreadPoolExecutor:
+    # Created on first use and reused, so each scan does not pay for thread startup
+    return ThreadPoolExecutor(max_workers=_SCAN_WORKERS, thread_name_prefix="policy-scan")
+
 @mcp.tool()
 def zero_trust_checklist(path_glob: str = "**/*.{yml,yaml}") -> dict:
     """Scan policies and produce a summarized ZT posture checklist."""
     stats = {"total": 0, "cnp": 0, "ccnp": 0, "with_l7": 0, "dns_ok": 0}
     details: List[dict] = []
 
-    for p in _iter_files(DEFAULT_DATA_DIR):
-        rel = p.relative_to(DEFAULT_DATA_DIR).as_posix()
-        if path_glob and not _matches(rel, path_glob):
-            continue
-        if p.suffix.lower() not in {".yaml", ".yml"}:
+    candidates: list[tuple[Path, str]] = []
+    rx = _compile_pattern(path_glob) if path_glob else None
+    for p, rel in _iter_files_with_rel(_glob_base(path_glob)):
+        if not rel.lower().endswith(_YAML_SUFFIXES):
             continue
-        try:
-            doc = yaml.safe_load(p.read_text(encoding="utf-8"))
-        except Exception:
+        if rx is not None and rx.match(rel) is None:
             continue
-        if not isinstance(doc, dict):
-            continue
-        kind = doc.get("kind")
-        if kind not in CILIUM_KINDS:
+        candidates.append((p, rel))
+
+    paths = [p for p, _ in candidates]
+    # Overlap file reads across a shared pool; results come back in walk order
+    if len(paths) > 1 and _SCAN_WORKERS > 1:
+        docs = list(_scan_pool().map(_load_cilium_doc, paths))
+    else:
+        docs = [_load_cilium_doc(p) for p in paths]
+
+    for (_, rel), doc in zip(candidates, docs):
+        if doc is None:
             continue
+        kind = doc["kind"]
         stats["total"] += 1
         stats["cnp" if kind == "CiliumNetworkPolicy" else "ccnp"] += 1
 
-        spec = doc.get("spec") or {}
+        spec = doc.get("spec")
+        spec = spec if isinstance(spec, dict) else {}
         l7 = False
-        dns = False
-        for section in (spec.get("ingress") or []) + (spec.get("egress") or []):
-            for tp in section.get("toPorts", []) or []:
+        for section in _dict_entries(spec.get("ingress")) + _dict_entries(spec.get("egress")):
+            for tp in _dict_entries(section.get("toPorts")):
                 if tp.get("ports") or tp.get("rules"):
                     l7 = True
-            if section.get("toFQDNs"):
-                dns = True
-            txt = yaml.safe_dump(section)
-            if "port: '53'" in txt or "port: 53" in txt:
-                dns = True
+        dns = _egress_has_dns(spec.get("egress"))
         if l7:
             stats["with_l7"] += 1
         if dns:
@@ -343,13 +650,68 @@ def prompt_write_cilium_policy() -> str:
 
 # --- K8s-aware tools (kubectl) ---
 
-def _run_cmd(cmd: list[str], timeout: int = 25) -> dict:
+def _run_cmd(cmd: list[str], timeout: int = 25, consume: Callable[[IO[bytes]], Any] | None = None) -> dict:
+    if consume is not None:
+        return _run_cmd_streaming(cmd, timeout, consume)
     try:
         p = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=False)
         return {"code": p.returncode, "stdout": p.stdout.strip(), "stderr": p.stderr.strip()}
     except Exception as e:
         return {"code": -1, "stdout": "", "stderr": str(e)}
 
+_STDOUT_HEAD_BYTES = 65536
+
+class _HeadTee:
+    """Pass reads through while keeping the first `limit` bytes for error reports."""
+
+    def __init__(self, stream: IO[bytes], limit: int = _STDOUT_HEAD_BYTES) -> None:
+        self._stream = stream
+        self._limit = limit
+        self.head = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        room = self._limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+        return chunk
+
+def _run_cmd_streaming(cmd: list[str], timeout: int, consume: Callable[[IO[bytes]], Any]) -> dict:
+    # Feed stdout straight into `consume` instead of buffering it into one string;
+    # only a bounded head is kept for the "stdout" field.
+    # stderr goes to a temp file so a chatty process cannot block on a full pipe.
+    parsed, error = None, ""
+    timed_out = threading.Event()
+    try:
+        with tempfile.TemporaryFile() as err, subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err) as p:
+            def _kill() -> None:
+                timed_out.set()
+                p.kill()
+
+            out = _HeadTee(p.stdout)
+            timer = threading.Timer(timeout, _kill)
+            timer.start()
+            try:
+                try:
+                    parsed = consume(out)
+                    for _ in iter(lambda: out.read(65536), b""):
+                        pass
+                except Exception as e:
+                    error = str(e)
+                    p.kill()
+                code = p.wait()
+            finally:
+                timer.cancel()
+            err.seek(0)
+            stderr = err.read().decode("utf-8", errors="replace").strip()
+    except Exception as e:
+        return {"code": -1, "stdout": "", "stderr": str(e), "parsed": None, "error": str(e)}
+    if timed_out.is_set():
+        msg = str(subprocess.TimeoutExpired(cmd, timeout))
+        return {"code": -1, "stdout": "", "stderr": msg, "parsed": None, "error": msg}
+    stdout = out.head.decode("utf-8", errors="replace").strip()
+    return {"code": code, "stdout": stdout, "stderr": stderr, "parsed": parsed, "error": error}
+
 @mcp.tool()
 def k8s_context() -> dict:
     """Return current kubectl context."""
@@ -359,10 +721,30 @@ def k8s_context() -> dict:
 @mcp.tool()
 def k8s_cluster_info() -> dict:
     """Return cluster info + nodes summary (kubectl cluster-info; get nodes -o wide)."""
-    info = _run_cmd(["kubectl", "cluster-info"])
-    nodes = _run_cmd(["kubectl", "get", "nodes", "-o", "wide"])
+    # Both calls are API-server round trips; overlap them
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        info_f = ex.submit(_run_cmd, ["kubectl", "cluster-info"])
+        nodes_f = ex.submit(_run_cmd, ["kubectl", "get", "nodes", "-o", "wide"])
+        info, nodes = info_f.result(), nodes_f.result()
     return {"cluster_info": info["stdout"], "nodes": nodes["stdout"], "stderr": "\n".join([info["stderr"], nodes["stderr"]]).strip()}
 
+def _parse_service_accounts(stream: IO[bytes]) -> list[dict]:
+    if ijson is not None:
+        # Only materialize metadata objects instead of the whole list
+        metas = ijson.items(stream, "items.item.metadata")
+    else:
+        data = _json_loads(stream.read() or b"{}")
+        metas = (it.get("metadata", {}) for it in data.get("items", []))
+    return [
+        {
+            "namespace": meta.get("namespace"),
+            "name": meta.get("name"),
+            "uid": meta.get("uid"),
+            "creationTimestamp": meta.get("creationTimestamp"),
+        }
+        for meta in metas
+    ]
+
 @mcp.tool()
 def k8s_service_accounts(all_namespaces: bool = True) -> dict:
     """List service accounts (JSON), summarized to namespace/name/age if available."""
@@ -370,21 +752,13 @@ def k8s_service_accounts(all_namespaces: bool = True) -> dict:
     if all_namespaces:
         args.append("-A")
     args += ["-o", "json"]
-    res = _run_cmd(args)
-    items = []
-    try:
-        data = json.loads(res["stdout"] or "{}")
-        for it in data.get("items", []):
-            meta = it.get("metadata", {})
-            items.append({
-                "namespace": meta.get("namespace"),
-                "name": meta.get("name"),
-                "uid": meta.get("uid"),
-                "creationTimestamp": meta.get("creationTimestamp"),
-            })
-    except Exception as e:
-        return {"items": [], "stderr": res["stderr"] or str(e), "raw": res["stdout"]}
-    return {"items": items, "stderr": res["stderr"]}
+    res = _run_cmd(args, consume=_parse_service_accounts)
+    # A parse failure kills kubectl, so check it before the (then -9) exit code
+    if res["error"] and res["stdout"]:
+        return {"items": [], "stderr": res["stderr"] or res["error"], "raw": res["stdout"]}
+    if res["code"] != 0 or not res["stdout"]:
+        return {"items": [], "stderr": res["stderr"]}
+    return {"items": res["parsed"], "stderr": res["stderr"]}
 
 # Entrypoint
 def main(argv: Optional[List[str]] = None) -> None:
@@ -1,6 +1,10 @@
+import io
 import os
+import sys
 import importlib
 
+import pytest
+
 def test_k8s_context_mock(tmp_path, monkeypatch):
     os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
     server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
@@ -13,3 +17,89 @@ def test_k8s_context_mock(tmp_path, monkeypatch):
     monkeypatch.setattr(server, "_run_cmd", fake_run)
     res = server.k8s_context()
     assert res["context"] == "gke_reflecting-surf-ctx"
+
+@pytest.mark.parametrize("parser", ["ijson", "json"])
+def test_k8s_service_accounts_mock(tmp_path, monkeypatch, parser):
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    if parser == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(server, "ijson", None)
+    payload = b'{"items": [{"metadata": {"namespace": "default", "name": "sa1", "uid": "u1", "creationTimestamp": "t"}, "secrets": []}]}'
+
+    def fake_run(cmd, timeout=60, consume=None):
+        return {"code": 0, "stdout": payload.decode(), "stderr": "", "parsed": consume(io.BytesIO(payload)), "error": ""}
+
+    monkeypatch.setattr(server, "_run_cmd", fake_run)
+    res = server.k8s_service_accounts()
+    assert res["items"] == [{"namespace": "default", "name": "sa1", "uid": "u1", "creationTimestamp": "t"}]
+
+def test_run_cmd_streams_stdout_into_consumer(tmp_path):
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    payload = '{"items": [{"metadata": {"name": "sa1"}}]}'
+    script = f"import sys; sys.stderr.write('warn'); print({payload!r})"
+    res = server._run_cmd([sys.executable, "-c", script], consume=server._parse_service_accounts)
+    assert res["code"] == 0
+    assert res["stderr"] == "warn"
+    assert res["parsed"][0]["name"] == "sa1"
+
+def _service_accounts_via(server, monkeypatch, script, timeout=25):
+    real_run = server._run_cmd
+
+    def run_script(cmd, timeout=timeout, consume=None):
+        return real_run([sys.executable, "-c", script], timeout=timeout, consume=consume)
+
+    monkeypatch.setattr(server, "_run_cmd", run_script)
+    return server.k8s_service_accounts()
+
+def test_k8s_service_accounts_reports_timeout(tmp_path, monkeypatch):
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    script = "import sys, time; sys.stdout.write('{\"items\": ['); sys.stdout.flush(); time.sleep(30)"
+    res = _service_accounts_via(server, monkeypatch, script, timeout=1)
+    assert res["items"] == []
+    assert "timed out after 1 seconds" in res["stderr"]
+    assert "raw" not in res
+
+def test_k8s_service_accounts_keeps_raw_on_bad_json(tmp_path, monkeypatch):
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    res = _service_accounts_via(server, monkeypatch, "print('not json')")
+    assert res["items"] == []
+    assert res["raw"] == "not json"
+    assert res["stderr"]
+
+def test_k8s_service_accounts_keeps_raw_when_killed_mid_stream(tmp_path, monkeypatch):
+    # Only the incremental parser can fail before EOF; the json fallback waits for the timeout
+    pytest.importorskip("ijson")
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    # The bad token comes first; the child keeps writing, then hangs, so only our kill ends it
+    script = "import sys, time; sys.stdout.write('{\"items\": [oops' + ' ' * 300000); sys.stdout.flush(); time.sleep(30)"
+    res = _service_accounts_via(server, monkeypatch, script, timeout=20)
+    assert res["items"] == []
+    assert res["stderr"]
+    assert res["raw"].startswith('{"items": [oops')
+    assert len(res["raw"].encode()) <= server._STDOUT_HEAD_BYTES
+
+def test_k8s_service_accounts_nonzero_exit_shape(tmp_path, monkeypatch):
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    script = "import sys; sys.stderr.write('forbidden'); sys.exit(1)"
+    res = _service_accounts_via(server, monkeypatch, script)
+    assert res == {"items": [], "stderr": "forbidden"}
+
+def test_k8s_cluster_info_mock(tmp_path, monkeypatch):
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+
+    def fake_run(cmd, timeout=60):
+        if cmd[1] == "cluster-info":
+            return {"code": 0, "stdout": "Kubernetes control plane is running", "stderr": ""}
+        return {"code": 0, "stdout": "node-1   Ready", "stderr": "warn: nodes"}
+
+    monkeypatch.setattr(server, "_run_cmd", fake_run)
+    res = server.k8s_cluster_info()
+    assert res == {"cluster_info": "Kubernetes control plane is running", "nodes": "node-1   Ready", "stderr": "warn: nodes"}
@@ -1,6 +1,8 @@
 import os
 import importlib
 
+import pytest
+
 def test_list_and_read(tmp_path, monkeypatch):
     data_dir = tmp_path / "data"
     data_dir.mkdir(parents=True, exist_ok=True)
@@ -11,3 +13,90 @@ def test_list_and_read(tmp_path, monkeypatch):
     assert "a.txt" in files
     text = server.read_text("a.txt")
     assert "hello world" in text
+
+def test_listing_and_yaml_cache_track_changes(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    (data_dir / "policies").mkdir(parents=True, exist_ok=True)
+    (data_dir / "policies" / "a.yaml").write_text("kind: ConfigMap\n", encoding="utf-8")
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    assert server.list_cilium_policies() == []
+
+    # nested add must show up even though the root dir mtime is unchanged
+    (data_dir / "policies" / "b.txt").write_text("x", encoding="utf-8")
+    assert "policies/b.txt" in server.list_files()
+
+    # edited file (different size) must be re-parsed
+    (data_dir / "policies" / "a.yaml").write_text("kind: CiliumNetworkPolicy\n", encoding="utf-8")
+    assert server.list_cilium_policies() == ["policies/a.yaml"]
+
+def test_glob_matching_semantics():
+    server = importlib.import_module("draupnir_mcp_server.server")
+    assert server._matches("x/y/a.txt", "*.txt")
+    assert server._matches("a.yml", "**/*.{yml,yaml}")
+    assert not server._matches("a.json", "**/*.{yml,yaml}")
+    assert server._matches("policies/a.yaml", "policies/**/*.yaml")
+    assert server._matches("policies/x/y/a.yaml", "policies/**/*.yaml")
+    assert server._matches("other/policies/a.yaml", "policies/**/*.yaml")
+    assert server._matches("draupnir-main/policies/a.yaml", "policies/*.yaml")
+    assert server._matches("draupnir-main/policies/a.yaml", "./policies/*.yaml")
+    assert not server._matches("draupnir-main/policies/a.yaml", "/policies/*.yaml")
+    assert server._matches("policies/a.yaml", "/policies/*.yaml")
+    assert not server._matches("a/b.txt", "a?b.txt")
+
+def test_list_files_prefix_walk(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    outside = tmp_path / "outside"
+    for d in (data_dir / "policies" / "team", data_dir / "other" / "policies", outside):
+        d.mkdir(parents=True, exist_ok=True)
+    (data_dir / "policies" / "team" / "a.yaml").write_text("x", encoding="utf-8")
+    (data_dir / "other" / "b.yaml").write_text("x", encoding="utf-8")
+    (data_dir / "other" / "policies" / "n.yaml").write_text("x", encoding="utf-8")
+    (outside / "c.yaml").write_text("x", encoding="utf-8")
+    (data_dir / "link").symlink_to(outside, target_is_directory=True)
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+
+    # relative globs still see every subtree; only rooted ones prune the walk
+    assert sorted(server.list_files("policies/**/*.yaml")) == ["other/policies/n.yaml", "policies/team/a.yaml"]
+    assert server.list_files("/policies/**/*.yaml") == ["policies/team/a.yaml"]
+    # symlinked prefixes are not followed, matching the full walk
+    assert server.list_files("/link/*.yaml") == []
+
+def test_set_data_dir_switches_without_reload(tmp_path, monkeypatch):
+    first, second = tmp_path / "first", tmp_path / "second"
+    for d, name in ((first, "one.txt"), (second, "two.txt")):
+        d.mkdir(parents=True, exist_ok=True)
+        (d / name).write_text(name, encoding="utf-8")
+    os.environ["STATIC_MCP_DATA_DIR"] = str(first)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    assert server.list_files() == ["one.txt"]
+
+    server.set_data_dir(second)
+    assert server.get_data_dir() == second.resolve()
+    assert server.list_files() == ["two.txt"]
+    assert server.read_text("two.txt") == "two.txt"
+
+def test_brace_expansion_nested_and_repeated():
+    server = importlib.import_module("draupnir_mcp_server.server")
+    assert server._expand_brace_patterns("{a,b}/{c,d}.txt") == ("a/c.txt", "a/d.txt", "b/c.txt", "b/d.txt")
+    assert server._expand_brace_patterns("*.{yml,{yaml,json}}") == ("*.yml", "*.yaml", "*.json")
+    assert server._expand_brace_patterns("{x}/{a,b") == ("{x}/{a,b",)
+    assert server._matches("b/d.txt", "{a,b}/{c,d}.txt")
+    assert server._matches("x/p.json", "**/*.{yml,{yaml,json}}")
+
+def test_brace_expansion_is_capped():
+    server = importlib.import_module("draupnir_mcp_server.server")
+    assert len(server._expand_brace_patterns("{a,b}" * 8)) == 256
+    with pytest.raises(ValueError):
+        server._compile_pattern("{a,b}" * 20)
+
+def test_read_text_rejects_escape(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (tmp_path / "data-secret.txt").write_text("secret", encoding="utf-8")
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    for path in ("../data-secret.txt", "../data/../data-secret.txt"):
+        with pytest.raises(PermissionError):
+            server.read_text(path)
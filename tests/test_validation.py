@@ -42,3 +42,166 @@ def test_validate_cilium_policy_with_rules(tmp_path, monkeypatch):
     warn_text = "\n".join(res["warnings"])
     assert "DNS egress" in warn_text or "DNS" in warn_text
     assert "L4/L7" in warn_text or "toPorts" in warn_text
+
+def test_zero_trust_checklist_dns_detection(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+
+    def policy(name: str, port) -> dict:
+        return {
+            "apiVersion": "cilium.io/v2",
+            "kind": "CiliumNetworkPolicy",
+            "metadata": {"name": name, "namespace": "default"},
+            "spec": {
+                "endpointSelector": {},
+                "egress": [{"toPorts": [{"ports": [{"port": port, "protocol": "UDP"}]}]}],
+            },
+        }
+
+    write_file(data_dir / "dns.yaml", yaml.safe_dump(policy("dns", 53)))
+    write_file(data_dir / "mdns.yml", yaml.safe_dump(policy("mdns", 5353)))
+    write_file(data_dir / "notes.txt", "port: 53")
+
+    res = server.zero_trust_checklist()
+    by_path = {d["path"]: d for d in res["details"]}
+    assert res["stats"]["total"] == 2
+    assert by_path["dns.yaml"]["dns_handled"] is True
+    assert by_path["mdns.yml"]["dns_handled"] is False
+
+def test_validate_dns_egress_is_structural(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+
+    def policy(port: str) -> dict:
+        return {
+            "apiVersion": "cilium.io/v2",
+            "kind": "CiliumNetworkPolicy",
+            "metadata": {"name": "web-ztp", "namespace": "default"},
+            "spec": {
+                "endpointSelector": {"matchLabels": {"app": "web"}},
+                "egress": [{"toPorts": [{"ports": [{"port": port, "protocol": "UDP"}]}]}],
+            },
+        }
+
+    write_file(data_dir / "dns.yaml", yaml.safe_dump(policy("53")))
+    write_file(data_dir / "other.yaml", yaml.safe_dump(policy("531")))
+
+    assert not any("DNS" in w for w in server.validate_cilium_policy("dns.yaml")["warnings"])
+    assert any("DNS" in w for w in server.validate_cilium_policy("other.yaml")["warnings"])
+
+def test_list_cilium_policies_sniffs_kind_header(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+
+    write_file(data_dir / "cm.yaml", "apiVersion: v1\nkind: ConfigMap\ndata: {}\n")
+    write_file(data_dir / "quoted.yaml", 'apiVersion: cilium.io/v2\nkind: "CiliumNetworkPolicy"\nmetadata: {name: q}\n')
+    # kind beyond the sniff window must still be found by the full parse
+    write_file(data_dir / "late.yaml", "# " + "x" * 5000 + "\nkind: CiliumClusterwideNetworkPolicy\n")
+
+    parsed = []
+    real_load = server._load_yaml_cached
+
+    def counting_load(path_str, mtime_ns, size):
+        parsed.append(Path(path_str).name)
+        return real_load(path_str, mtime_ns, size)
+
+    monkeypatch.setattr(server, "_load_yaml_cached", counting_load)
+    assert sorted(server.list_cilium_policies()) == ["late.yaml", "quoted.yaml"]
+    assert "cm.yaml" not in parsed
+
+def test_generate_policy_template_fast_path_matches_dumper(tmp_path, monkeypatch):
+    import random
+
+    os.environ["STATIC_MCP_DATA_DIR"] = str(tmp_path / "data")
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    rng = random.Random(0)
+    alphabet = "abcXYZ019_-.*:'\" #"
+    words = ["web", "yes", "Null", "on", "80", "0", "089", "*.amazonaws.com", "api.example.com", "1e3", "-x", ""]
+
+    def token() -> str:
+        if rng.random() < 0.5:
+            return rng.choice(words)
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+
+    for _ in range(500):
+        args = {
+            "app": token(),
+            "namespace": token(),
+            "ingress_ports": [f"{token()}/{rng.choice(['TCP', 'UDP', ''])}" for _ in range(rng.randint(0, 3))],
+            "egress_fqdns": [token() for _ in range(rng.randint(0, 3))],
+        }
+        assert server.generate_policy_template(**args) == server.generate_policy_template(**args, strict=True), args
+    assert server._render_policy_fast("web", "default", [("80", "TCP")], ["*.amazonaws.com"]) is not None
+
+def test_validate_result_does_not_alias_yaml_cache(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    policy = {
+        "apiVersion": "cilium.io/v2",
+        "kind": "CiliumNetworkPolicy",
+        "metadata": {"name": "web", "labels": {"team": "a"}},
+        "spec": {"endpointSelector": {}},
+    }
+    write_file(data_dir / "web.yaml", yaml.safe_dump(policy))
+
+    first = server.validate_cilium_policy("web.yaml")
+    first["metadata"]["labels"]["team"] = "mutated"
+    assert server.validate_cilium_policy("web.yaml")["metadata"]["labels"] == {"team": "a"}
+
+def test_validate_malformed_port_entry(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    write_file(
+        data_dir / "bad.yaml",
+        "apiVersion: cilium.io/v2\nkind: CiliumNetworkPolicy\nmetadata: {name: bad}\n"
+        "spec:\n  endpointSelector: {}\n  egress: [{toPorts: [{ports: [\"53/UDP\"]}]}]\n",
+    )
+
+    res = server.validate_cilium_policy("bad.yaml")
+    assert res["kind"] == "CiliumNetworkPolicy"
+    assert any("DNS" in w for w in res["warnings"])
+
+def test_zero_trust_checklist_survives_malformed_policy(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    write_file(
+        data_dir / "bad.yaml",
+        "apiVersion: cilium.io/v2\nkind: CiliumNetworkPolicy\nmetadata: {name: bad}\n"
+        "spec:\n  egress: [\"allow-all\", {toPorts: [\"53\", {ports: [\"53/UDP\"]}]}]\n",
+    )
+    write_file(data_dir / "odd.yaml", "kind: CiliumNetworkPolicy\nspec: [1, 2]\n")
+
+    res = server.zero_trust_checklist()
+    by_path = {d["path"]: d for d in res["details"]}
+    assert res["stats"]["total"] == 2
+    assert by_path["bad.yaml"] == {"path": "bad.yaml", "kind": "CiliumNetworkPolicy", "l7": True, "dns_handled": False}
+    assert by_path["odd.yaml"]["dns_handled"] is False
+
+def test_zero_trust_checklist_keeps_walk_order(tmp_path, monkeypatch):
+    import time
+
+    data_dir = tmp_path / "data"
+    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
+    server = importlib.reload(importlib.import_module("draupnir_mcp_server.server"))
+    monkeypatch.setattr(server, "_SCAN_WORKERS", 4)
+    for i in range(6):
+        write_file(data_dir / f"d{i % 2}" / f"p{i}.yaml", "kind: CiliumNetworkPolicy\nspec: {}\n")
+
+    real_load = server._load_cilium_doc
+    delays = {}
+
+    def slow_load(p):
+        # earlier files finish last, so out-of-order completion is guaranteed
+        time.sleep(delays[p.name])
+        return real_load(p)
+
+    expected = server.list_cilium_policies()
+    delays.update({Path(rel).name: 0.02 * (len(expected) - i) for i, rel in enumerate(expected)})
+    monkeypatch.setattr(server, "_load_cilium_doc", slow_load)
+    assert [d["path"] for d in server.zero_trust_checklist()["details"]] == expected
@@ -11,18 +11,18 @@ import streamlit as st
 st.set_page_config(page_title="Draupnir MCP Server UI", layout="wide")
 
 
-def _reload_server(data_dir: Path):
-    os.environ["STATIC_MCP_DATA_DIR"] = str(data_dir)
-    # Lazy import + reload to pick up new data dir on each change
+def _load_server(data_dir: Path):
+    # Reloading would re-register every tool and drop the server's caches
     mod = importlib.import_module("draupnir_mcp_server.server")
-    return importlib.reload(mod)
+    mod.set_data_dir(data_dir)
+    return mod
 
 
 def init_state():
     if "data_dir" not in st.session_state:
         st.session_state.data_dir = Path(os.environ.get("STATIC_MCP_DATA_DIR", "./data")).resolve()
     if "server" not in st.session_state:
-        st.session_state.server = _reload_server(st.session_state.data_dir)
+        st.session_state.server = _load_server(st.session_state.data_dir)
 
 
 def sidebar_controls():
@@ -36,12 +36,12 @@ def sidebar_controls():
     with col1:
         if st.button("Load", width="stretch"):
             st.session_state.data_dir = Path(data_dir_input).expanduser().resolve()
-            st.session_state.server = _reload_server(st.session_state.data_dir)
+            st.session_state.server = _load_server(st.session_state.data_dir)
             st.sidebar.success(f"Loaded: {st.session_state.data_dir}")
     with col2:
         if st.button("Refresh", width="stretch"):
-            st.session_state.server = _reload_server(st.session_state.data_dir)
-            st.sidebar.info("Module reloaded")
+            st.session_state.server = _load_server(st.session_state.data_dir)
+            st.sidebar.info(f"Refreshed: {st.session_state.data_dir}")
 
     st.sidebar.caption("Tip: Make sure files are under the data dir.")
 